@@ -1,153 +1,271 @@
 import os
-import json
-from dotenv import load_dotenv
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from enum import Enum
+from types import MappingProxyType
+from dotenv import dotenv_values
+from pydantic import BaseModel, ConfigDict, Field, PositiveFloat, PositiveInt, TypeAdapter, ValidationError, conint
+
+_DOTENV_LOADED = False
+_ENV_CACHE = {}
+
+
+def _ensure_dotenv():
+    """Load environment variables from .env once per process"""
+    global _DOTENV_LOADED
+    if not _DOTENV_LOADED:
+        # Same semantics as load_dotenv(override=False), but the file is parsed only once
+        for key, value in dotenv_values().items():
+            if value is not None:
+                os.environ.setdefault(key, value)
+                _ENV_CACHE[key] = os.environ[key]
+        _DOTENV_LOADED = True
+
+
+def _freeze(obj):
+    """Recursively wrap dicts in read-only mappings"""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    return obj
+
+
+def env(key, default=None):
+    """Get an environment variable, using the cached .env values first"""
+    if key in _ENV_CACHE:
+        return _ENV_CACHE[key]
+    return os.environ.get(key, default)
+
 
 # Load environment variables
-load_dotenv()
+_ensure_dotenv()
+
+_LOG_LISTENER = None
+
+
+def setup_logging(log_file="trading_bot.log"):
+    """Configure root logging once per process
+
+    Records are queued and written by a background thread, so log calls
+    in the trading loop never block on disk I/O.
+    """
+    global _LOG_LISTENER
+    if _LOG_LISTENER is not None:
+        return
+
+    log_queue = queue.Queue(-1)
+    _LOG_LISTENER = QueueListener(
+        log_queue,
+        logging.FileHandler(log_file),
+        logging.StreamHandler(),
+        respect_handler_level=True
+    )
+    _LOG_LISTENER.start()
+    atexit.register(_LOG_LISTENER.stop)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[QueueHandler(log_queue)]
+    )
+
+
+class TradingCfg(BaseModel):
+    """Trading settings"""
+    model_config = ConfigDict(frozen=True)
+
+    asset: str = "EUR/USD"
+    trade_amount: PositiveFloat = 1
+    expiry_minutes: PositiveInt = 1
+    trade_interval_minutes: conint(ge=0) = 5  # 0 trades again as soon as the last one settles
+    session_duration_minutes: PositiveInt = 60
+
+
+class StrategyParams(BaseModel):
+    """Strategy parameters (extra keys are passed through to the strategy)"""
+    model_config = ConfigDict(extra="allow", frozen=True)
+
+    short_period: PositiveInt = 5
+    long_period: PositiveInt = 10
+    rsi_period: PositiveInt = 14
+    rsi_overbought: conint(ge=0, le=100) = 70
+    rsi_oversold: conint(ge=0, le=100) = 30
+
+
+class StrategyType(str, Enum):
+    """Available trading strategies"""
+    TREND = "trend_following"
+    RSI = "rsi"
+    RANDOM = "random"
+
+
+class StrategyCfg(BaseModel):
+    """Strategy settings"""
+    model_config = ConfigDict(frozen=True, use_enum_values=True)
+
+    type: StrategyType = StrategyType.TREND.value
+    parameters: StrategyParams = Field(default_factory=StrategyParams)
+
+
+class RiskCfg(BaseModel):
+    """Risk management settings"""
+    model_config = ConfigDict(frozen=True)
+
+    martingale_enabled: bool = False
+    martingale_coefficient: PositiveFloat = 2.1
+    max_martingale_level: PositiveInt = 5
+    max_daily_loss: PositiveFloat = 20  # in dollars
+    max_daily_trades: PositiveInt = 20
+
+
+class BotConfigModel(BaseModel):
+    """Complete bot configuration"""
+    model_config = ConfigDict(frozen=True)
+
+    trading: TradingCfg = Field(default_factory=TradingCfg)
+    strategy: StrategyCfg = Field(default_factory=StrategyCfg)
+    risk_management: RiskCfg = Field(default_factory=RiskCfg)
+
+
+# Serializes straight to bytes, without the intermediate str from model_dump_json()
+_CONFIG_ADAPTER = TypeAdapter(BotConfigModel)
+
+
+# Interactive prompts as (dotted config path, label); answers are validated by BotConfigModel
+TRADING_PROMPTS = [
+    ("trading.asset", "Asset to trade"),
+    ("trading.trade_amount", "Trade amount in $"),
+    ("trading.expiry_minutes", "Expiry time in minutes"),
+    ("trading.trade_interval_minutes", "Interval between trades in minutes"),
+    ("trading.session_duration_minutes", "Trading session duration in minutes"),
+]
+
+STRATEGY_PROMPTS = {
+    StrategyType.TREND: [
+        ("strategy.parameters.short_period", "Short period"),
+        ("strategy.parameters.long_period", "Long period"),
+    ],
+    StrategyType.RSI: [
+        ("strategy.parameters.rsi_period", "RSI period"),
+        ("strategy.parameters.rsi_overbought", "RSI overbought level"),
+        ("strategy.parameters.rsi_oversold", "RSI oversold level"),
+    ],
+}
+
+MARTINGALE_PROMPTS = [
+    ("risk_management.martingale_coefficient", "Martingale coefficient"),
+    ("risk_management.max_martingale_level", "Max Martingale level"),
+]
+
+LIMIT_PROMPTS = [
+    ("risk_management.max_daily_loss", "Max daily loss in $"),
+    ("risk_management.max_daily_trades", "Max daily trades"),
+]
+
+
+def _ask(cfg, prompts):
+    """Prompt for each entry and store non-empty answers in cfg"""
+    for path, label in prompts:
+        *parents, key = path.split(".")
+        section = cfg
+        for name in parents:
+            section = section[name]
+        raw = input(f"{label} [{section[key]}]: ")
+        if raw:
+            section[key] = raw
+
 
 class BotConfig:
     def __init__(self, config_file="config.json"):
         self.config_file = config_file
         self.config = self.load_config()
-    
+        self._cached = None
+
     def load_config(self):
-        """Load configuration from file or create default"""
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading config file: {str(e)}")
-                return self.get_default_config()
-        else:
+        """Load configuration from file or create default
+
+        A config file that exists but cannot be read or validated raises
+        instead of falling back to defaults, so neither a trading session
+        nor save_config() runs on values the user never chose.
+        """
+        try:
+            return BotConfigModel.model_validate_json(Path(self.config_file).read_bytes())
+        except FileNotFoundError:
             return self.get_default_config()
-    
+        except (OSError, ValidationError) as e:
+            raise ValueError(f"Error loading config file {self.config_file}: {str(e)}") from e
+
     def get_default_config(self):
         """Return default configuration"""
-        return {
-            "trading": {
-                "asset": "EUR/USD",
-                "trade_amount": 1,
-                "expiry_minutes": 1,
-                "trade_interval_minutes": 5,
-                "session_duration_minutes": 60
-            },
-            "strategy": {
-                "type": "trend_following",  # Options: trend_following, rsi, random
-                "parameters": {
-                    "short_period": 5,
-                    "long_period": 10,
-                    "rsi_period": 14,
-                    "rsi_overbought": 70,
-                    "rsi_oversold": 30
-                }
-            },
-            "risk_management": {
-                "martingale_enabled": False,
-                "martingale_coefficient": 2.1,
-                "max_martingale_level": 5,
-                "max_daily_loss": 20,  # in dollars
-                "max_daily_trades": 20
-            }
-        }
-    
+        return BotConfigModel()
+
     def save_config(self):
         """Save configuration to file"""
+        self._cached = None
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=4)
+            Path(self.config_file).write_bytes(_CONFIG_ADAPTER.dump_json(self.config, indent=4))
             print(f"Configuration saved to {self.config_file}")
             return True
-        except Exception as e:
+        except OSError as e:
             print(f"Error saving config file: {str(e)}")
             return False
-    
+
     def update_config(self, new_config):
         """Update configuration with new values"""
-        self.config.update(new_config)
+        self.config = BotConfigModel.model_validate({**self.config.model_dump(), **new_config})
         return self.save_config()
-    
+
     def get_config(self):
-        """Get current configuration"""
-        return self.config
-    
+        """Get a read-only view of the current configuration (built once per update)"""
+        if self._cached is None:
+            self._cached = _freeze(self.config.model_dump())
+        return self._cached
+
     def setup_interactive(self):
         """Interactive configuration setup"""
         print("\n===== Pocket Option Trading Bot Configuration =====\n")
-        
+        cfg = self.config.model_dump()
+
         # Trading settings
         print("\n--- Trading Settings ---")
-        self.config["trading"]["asset"] = input(f"Asset to trade [{self.config['trading']['asset']}]: ") or self.config["trading"]["asset"]
-        
-        try:
-            self.config["trading"]["trade_amount"] = float(input(f"Trade amount in $ [{self.config['trading']['trade_amount']}]: ") or self.config["trading"]["trade_amount"])
-        except ValueError:
-            print("Invalid input. Using default value.")
-        
-        try:
-            self.config["trading"]["expiry_minutes"] = int(input(f"Expiry time in minutes [{self.config['trading']['expiry_minutes']}]: ") or self.config["trading"]["expiry_minutes"])
-        except ValueError:
-            print("Invalid input. Using default value.")
-        
-        try:
-            self.config["trading"]["trade_interval_minutes"] = int(input(f"Interval between trades in minutes [{self.config['trading']['trade_interval_minutes']}]: ") or self.config["trading"]["trade_interval_minutes"])
-        except ValueError:
-            print("Invalid input. Using default value.")
-        
-        try:
-            self.config["trading"]["session_duration_minutes"] = int(input(f"Trading session duration in minutes [{self.config['trading']['session_duration_minutes']}]: ") or self.config["trading"]["session_duration_minutes"])
-        except ValueError:
-            print("Invalid input. Using default value.")
-        
+        _ask(cfg, TRADING_PROMPTS)
+
         # Strategy settings
         print("\n--- Strategy Settings ---")
-        strategy_types = ["trend_following", "rsi", "random"]
+        strategy_types = [s.value for s in StrategyType]
         print("Available strategies:")
         for i, strategy in enumerate(strategy_types):
             print(f"{i+1}. {strategy}")
-        
-        try:
-            strategy_choice = int(input(f"Select strategy (1-{len(strategy_types)}): ")) - 1
-            if 0 <= strategy_choice < len(strategy_types):
-                self.config["strategy"]["type"] = strategy_types[strategy_choice]
-            else:
-                print("Invalid choice. Using default strategy.")
-        except ValueError:
-            print("Invalid input. Using default strategy.")
-        
-        if self.config["strategy"]["type"] == "trend_following":
-            try:
-                self.config["strategy"]["parameters"]["short_period"] = int(input(f"Short period [{self.config['strategy']['parameters']['short_period']}]: ") or self.config["strategy"]["parameters"]["short_period"])
-                self.config["strategy"]["parameters"]["long_period"] = int(input(f"Long period [{self.config['strategy']['parameters']['long_period']}]: ") or self.config["strategy"]["parameters"]["long_period"])
-            except ValueError:
-                print("Invalid input. Using default values.")
-        
-        elif self.config["strategy"]["type"] == "rsi":
-            try:
-                self.config["strategy"]["parameters"]["rsi_period"] = int(input(f"RSI period [{self.config['strategy']['parameters']['rsi_period']}]: ") or self.config["strategy"]["parameters"]["rsi_period"])
-                self.config["strategy"]["parameters"]["rsi_overbought"] = int(input(f"RSI overbought level [{self.config['strategy']['parameters']['rsi_overbought']}]: ") or self.config["strategy"]["parameters"]["rsi_overbought"])
-                self.config["strategy"]["parameters"]["rsi_oversold"] = int(input(f"RSI oversold level [{self.config['strategy']['parameters']['rsi_oversold']}]: ") or self.config["strategy"]["parameters"]["rsi_oversold"])
-            except ValueError:
-                print("Invalid input. Using default values.")
-        
+
+        strategy = cfg["strategy"]
+        raw = input(f"Select strategy (1-{len(strategy_types)}) [{strategy['type']}]: ")
+        # Accept either the list index or the strategy name; the model validates the result
+        if raw:
+            strategy["type"] = {str(i+1): s for i, s in enumerate(strategy_types)}.get(raw, raw)
+
+        _ask(cfg, STRATEGY_PROMPTS.get(strategy["type"], []))
+
         # Risk management settings
         print("\n--- Risk Management Settings ---")
-        martingale_choice = input(f"Enable Martingale strategy? (y/n) [{('y' if self.config['risk_management']['martingale_enabled'] else 'n')}]: ").lower() or ('y' if self.config['risk_management']['martingale_enabled'] else 'n')
-        self.config["risk_management"]["martingale_enabled"] = martingale_choice == 'y'
-        
-        if self.config["risk_management"]["martingale_enabled"]:
-            try:
-                self.config["risk_management"]["martingale_coefficient"] = float(input(f"Martingale coefficient [{self.config['risk_management']['martingale_coefficient']}]: ") or self.config["risk_management"]["martingale_coefficient"])
-                self.config["risk_management"]["max_martingale_level"] = int(input(f"Max Martingale level [{self.config['risk_management']['max_martingale_level']}]: ") or self.config["risk_management"]["max_martingale_level"])
-            except ValueError:
-                print("Invalid input. Using default values.")
-        
+        risk = cfg["risk_management"]
+        cur = 'y' if risk["martingale_enabled"] else 'n'
+        raw = input(f"Enable Martingale strategy? (y/n) [{cur}]: ").lower()
+        risk["martingale_enabled"] = (raw or cur) == 'y'
+
+        if risk["martingale_enabled"]:
+            _ask(cfg, MARTINGALE_PROMPTS)
+
+        _ask(cfg, LIMIT_PROMPTS)
+
+        # Validate all answers in one pass
         try:
-            self.config["risk_management"]["max_daily_loss"] = float(input(f"Max daily loss in $ [{self.config['risk_management']['max_daily_loss']}]: ") or self.config["risk_management"]["max_daily_loss"])
-            self.config["risk_management"]["max_daily_trades"] = int(input(f"Max daily trades [{self.config['risk_management']['max_daily_trades']}]: ") or self.config["risk_management"]["max_daily_trades"])
-        except ValueError:
-            print("Invalid input. Using default values.")
-        
+            self.config = BotConfigModel.model_validate(cfg)
+        except ValidationError as e:
+            print(f"\nInvalid configuration, keeping previous values:\n{e}")
+            return
+
         # Save configuration
         self.save_config()
         print("\nConfiguration completed successfully!")
@@ -8,49 +8,61 @@ import os
 import sys
 import logging
 import argparse
-from config import BotConfig
-from pocket_option_bot import PocketOptionBot
+import functools
+from config import BotConfig, StrategyType, setup_logging
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("trading_bot.log"),
-        logging.StreamHandler()
-    ]
-)
+setup_logging()
 logger = logging.getLogger("PocketOptionBot.Main")
 
-def parse_arguments():
-    """Parse command line arguments"""
+# Command line option -> (section, key) of the configuration value it overrides
+ARG_MAP = {
+    "duration": ("trading", "session_duration_minutes"),
+    "interval": ("trading", "trade_interval_minutes"),
+    "asset": ("trading", "asset"),
+    "amount": ("trading", "trade_amount"),
+    "strategy": ("strategy", "type"),
+    "martingale": ("risk_management", "martingale_enabled"),
+}
+
+@functools.lru_cache(maxsize=1)
+def _get_parser():
+    """Build the command line parser once and reuse it"""
     parser = argparse.ArgumentParser(description='Pocket Option Trading Bot')
     
     parser.add_argument('--configure', action='store_true', 
                         help='Configure the bot before starting')
     
-    parser.add_argument('--duration', type=int, default=None,
+    # Override options are left out of the namespace unless given on the command line
+    parser.add_argument('--duration', type=int, default=argparse.SUPPRESS,
                         help='Trading session duration in minutes')
     
-    parser.add_argument('--interval', type=int, default=None,
+    parser.add_argument('--interval', type=int, default=argparse.SUPPRESS,
                         help='Interval between trades in minutes')
     
-    parser.add_argument('--asset', type=str, default=None,
+    parser.add_argument('--asset', type=str, default=argparse.SUPPRESS,
                         help='Asset to trade (e.g., EUR/USD)')
     
-    parser.add_argument('--amount', type=float, default=None,
+    parser.add_argument('--amount', type=float, default=argparse.SUPPRESS,
                         help='Trade amount in dollars')
     
-    parser.add_argument('--strategy', type=str, choices=['trend_following', 'rsi', 'random'], 
-                        default=None, help='Trading strategy to use')
+    parser.add_argument('--strategy', type=str, choices=[s.value for s in StrategyType], 
+                        default=argparse.SUPPRESS, help='Trading strategy to use')
+    
+    parser.add_argument('--martingale', dest='martingale', action='store_true',
+                        default=argparse.SUPPRESS, help='Enable Martingale strategy')
     
-    parser.add_argument('--martingale', action='store_true',
-                        help='Enable Martingale strategy')
+    parser.add_argument('--no-martingale', dest='martingale', action='store_false',
+                        default=argparse.SUPPRESS, help='Disable Martingale strategy')
     
-    parser.add_argument('--no-martingale', action='store_true',
-                        help='Disable Martingale strategy')
+    parser.add_argument('--fresh', action='store_true',
+                        help='Ignore the saved trade history and Martingale state')
     
-    return parser.parse_args()
+    return parser
+
+def parse_arguments(argv=None):
+    """Parse command line arguments"""
+    return _get_parser().parse_args(argv)
 
 def main():
     """Main function to run the bot"""
@@ -61,47 +73,29 @@ def main():
         # Load configuration
         config = BotConfig()
         
+        # Collect the override flags that were actually supplied
+        overrides = {name: getattr(args, name) for name in ARG_MAP if hasattr(args, name)}
+        
         # Configure the bot if requested
         if args.configure:
             config.setup_interactive()
-        else:
-            # Apply command line overrides to configuration
-            cfg = config.get_config()
-            
-            if args.asset:
-                cfg["trading"]["asset"] = args.asset
-                
-            if args.amount:
-                cfg["trading"]["trade_amount"] = args.amount
-                
-            if args.duration:
-                cfg["trading"]["session_duration_minutes"] = args.duration
-                
-            if args.interval:
-                cfg["trading"]["trade_interval_minutes"] = args.interval
-                
-            if args.strategy:
-                cfg["strategy"]["type"] = args.strategy
-                
-            if args.martingale:
-                cfg["risk_management"]["martingale_enabled"] = True
-                
-            if args.no_martingale:
-                cfg["risk_management"]["martingale_enabled"] = False
-                
+        elif overrides:
+            # Apply command line overrides to a mutable copy of the configuration
+            cfg = config.config.model_dump()
+            for name, value in overrides.items():
+                section, key = ARG_MAP[name]
+                cfg[section][key] = value
             config.update_config(cfg)
         
-        # Create and configure the bot
-        bot = PocketOptionBot(config.get_config())
-        
         # Display configuration
+        cfg = config.get_config()
         print("\n===== Pocket Option Trading Bot =====")
-        print(f"Asset: {bot.current_asset}")
-        print(f"Trade amount: ${bot.trade_amount}")
-        print(f"Strategy: {bot.strategy_type}")
-        print(f"Martingale enabled: {bot.martingale_enabled}")
-        print(f"Session duration: {bot.config['trading']['session_duration_minutes']} minutes")
-        print(f"Trade interval: {bot.config['trading']['trade_interval_minutes']} minutes")
+        print(f"Asset: {cfg['trading']['asset']}")
+        print(f"Trade amount: ${cfg['trading']['trade_amount']}")
+        print(f"Strategy: {cfg['strategy']['type']}")
+        print(f"Martingale enabled: {cfg['risk_management']['martingale_enabled']}")
+        print(f"Session duration: {cfg['trading']['session_duration_minutes']} minutes")
+        print(f"Trade interval: {cfg['trading']['trade_interval_minutes']} minutes")
         print("=====================================\n")
         
         # Confirm start
@@ -110,13 +104,19 @@ def main():
             print("Trading session cancelled.")
             return
         
+        # Import lazily so Selenium/webdriver-manager are only loaded when a browser is needed
+        from pocket_option_bot import PocketOptionBot
+        
+        # Create and configure the bot
+        bot = PocketOptionBot(cfg, restore_state=not args.fresh)
+        
         # Run a trading session
         bot.run_trading_session()
         
     except KeyboardInterrupt:
         logger.info("Trading session interrupted by user")
     except Exception as e:
-        logger.error(f"Unhandled exception: {str(e)}")
+        logger.error("Unhandled exception: %s", e)
     finally:
         # Make sure to close the WebDriver
         if 'bot' in locals() and hasattr(bot, 'driver') and bot.driver:
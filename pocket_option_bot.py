@@ -1,45 +1,156 @@
 import os
+import json
 import time
-import random
 import logging
-from datetime import datetime
-import pandas as pd
+import asyncio
+import threading
+from datetime import date, datetime
 import numpy as np
-from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 
 # Import custom modules
-from config import BotConfig
-from strategies import get_strategy
+from config import BotConfig, env, setup_logging
+from strategies import MarketData, get_strategy, warm_up_kernels
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("trading_bot.log"),
-        logging.StreamHandler()
-    ]
-)
+setup_logging()
 logger = logging.getLogger("PocketOptionBot")
 
-# Load environment variables
-load_dotenv()
+# Local state kept between runs
+CACHE_DIR = os.path.expanduser("~/.cache/revo")
+DRIVER_CACHE_FILE = os.path.join(CACHE_DIR, "chromedriver_path")
+CHROME_PROFILE_DIR = os.path.join(CACHE_DIR, "chrome-profile")
+STATE_FILE = os.path.join(CACHE_DIR, "state.npz")
+
+# Restored candles are only fed back into the live buffer if the newest one is this recent
+CANDLE_RESTORE_MAX_AGE_SECONDS = 120
+
+LOGIN_URL = "https://pocketoption.com/en/login/"
+TRADING_URL = "https://pocketoption.com/en/cabinet/"
+
+# The next signal is prefetched this long before the next trade is due, and
+# only used while it is at most one 1m candle old
+PREFETCH_LEAD_SECONDS = 5
+PREFETCH_MAX_AGE_SECONDS = 60
+
+# How often the async trading loop polls the deals list while a trade settles
+SETTLEMENT_POLL_SECONDS = 0.25
+# Extra time after expiry for the platform to show the deal result
+SETTLEMENT_MARGIN_SECONDS = 10
+
+# Trade history record; direction and status are indexes into TRADE_DIRECTIONS / TRADE_STATUSES
+TRADE_DTYPE = np.dtype([
+    ('ts', 'f8'),
+    ('amount', 'f8'),
+    ('expiry', 'i2'),
+    ('direction', 'u1'),
+    ('status', 'u1'),
+    ('mg_level', 'u1'),
+])
+TRADE_DIRECTIONS = ("call", "put")
+TRADE_STATUSES = ("pending", "win", "loss")
+
+# Counters saved next to today's trades, see PocketOptionBot._save_state()
+STATE_META_DTYPE = np.dtype([
+    ('day', 'U10'),
+    ('asset', 'U32'),
+    ('mg_level', 'i8'),
+    ('daily_trades', 'i8'),
+    ('daily_loss', 'f8'),
+])
+
+# DevTools event carrying a received WebSocket message, see PocketOptionBot._drain_ws_frames()
+WS_FRAME_EVENT = "Network.webSocketFrameReceived"
+
+# Trade panel controls reused across trades: name -> (locator, wait condition)
+TRADE_CONTROLS = {
+    "amount_input": ((By.CLASS_NAME, "amount-input"), EC.presence_of_element_located),
+    "expiry_selector": ((By.CLASS_NAME, "expiry-selector"), EC.element_to_be_clickable),
+    "call_button": ((By.CLASS_NAME, "call-button"), EC.element_to_be_clickable),
+    "put_button": ((By.CLASS_NAME, "put-button"), EC.element_to_be_clickable),
+}
+
+def fast_wait(driver, timeout=10, poll_frequency=0.1):
+    """WebDriverWait polling every 100 ms (default 500 ms) that tolerates re-rendered elements"""
+    return WebDriverWait(
+        driver, timeout, poll_frequency=poll_frequency,
+        ignored_exceptions=(StaleElementReferenceException,)
+    )
+
+
+# Reads everything the trading loop polls for in a single DevTools round trip.
+# The newest deal's status cell only gets a data-result attribute once the deal settles;
+# the chart container exposes its candles as JSON rows of [ts, open, high, low, close, volume].
+PAGE_STATE_JS = """
+(() => {
+    const balance = document.querySelector('.balance-value');
+    const deal = document.querySelector('.deals-list .deal-row:first-child');
+    const status = deal ? deal.querySelector('.status[data-result]') : null;
+    const chart = document.querySelector('.chart-container[data-candles]');
+    let candles = null;
+    try {
+        candles = chart ? JSON.parse(chart.dataset.candles) : null;
+    } catch (e) {}
+    return {
+        balance: balance ? balance.innerText : null,
+        deal_id: deal ? deal.getAttribute('data-id') : null,
+        result: status ? status.getAttribute('data-result') : null,
+        candles: candles
+    };
+})()
+"""
+
+
+class CandleBuffer:
+    """Fixed-size ring buffer of candle rows [ts, open, high, low, close, volume]"""
+    def __init__(self, capacity=500):
+        self._rows = np.empty((capacity, 6), dtype=np.float64)
+        self._end = 0  # next write position
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def clear(self):
+        self._end = 0
+        self._size = 0
+
+    def push(self, rows):
+        """Append candle rows; a row with the same timestamp as the newest one replaces it"""
+        capacity = len(self._rows)
+        for row in rows:
+            if self._size:
+                last = (self._end - 1) % capacity
+                if row[0] < self._rows[last, 0]:
+                    continue  # already seen (history snapshot)
+                if row[0] == self._rows[last, 0]:
+                    self._rows[last] = row  # update of the still-forming candle
+                    continue
+            self._rows[self._end] = row
+            self._end = (self._end + 1) % capacity
+            self._size = min(self._size + 1, capacity)
+
+    def last(self, n):
+        """Return the newest n rows, oldest first"""
+        n = min(n, self._size)
+        return self._rows[(self._end - n + np.arange(n)) % len(self._rows)]
+
 
 class PocketOptionBot:
-    def __init__(self, config=None):
+    def __init__(self, config=None, restore_state=True):
         # Load configuration
         self.config = config or BotConfig().get_config()
 
         # Authentication
-        self.email = os.getenv("POCKET_OPTION_EMAIL")
-        self.password = os.getenv("POCKET_OPTION_PASSWORD")
+        self.email = env("POCKET_OPTION_EMAIL")
+        self.password = env("POCKET_OPTION_PASSWORD")
 
         # Trading parameters
         self.driver = None
@@ -51,8 +162,12 @@ class PocketOptionBot:
         # Risk management
         self.martingale_enabled = self.config["risk_management"]["martingale_enabled"]
         self.martingale_coefficient = self.config["risk_management"]["martingale_coefficient"]
-        self.martingale_stack = []
         self.max_martingale_level = self.config["risk_management"]["max_martingale_level"]
+        self.martingale_stack = [
+            round(self.trade_amount * self.martingale_coefficient ** i, 2)
+            for i in range(self.max_martingale_level)
+        ] if self.martingale_enabled else []
+        self._current_martingale_level = 0
         self.max_daily_loss = self.config["risk_management"]["max_daily_loss"]
         self.max_daily_trades = self.config["risk_management"]["max_daily_trades"]
 
@@ -60,11 +175,38 @@ class PocketOptionBot:
         self.strategy_type = self.config["strategy"]["type"]
         self.strategy_params = self.config["strategy"]["parameters"]
         self.strategy = get_strategy(self.strategy_type, self.strategy_params)
-
-        # Session data
-        self.trade_history = []
+        warm_up_kernels()
+
+        # Trade history in a growable structured array, see _record_trade(); today's
+        # trades are restored on a warm restart, the win/loss counters are per session
+        self._trades = np.empty(max(self.max_daily_trades, 1), dtype=TRADE_DTYPE)
+        self._n_trades = 0
+        self._session_first_trade = 0  # index of the session's first trade in _trades
+        self._wins = 0
+        self._losses = 0
         self.daily_loss = 0
         self.daily_trades = 0
+        self._trading_day = None  # day the daily counters belong to
+
+        # Cached trade panel elements, see _use_control()
+        self._controls = {}
+        # Newest deal row before the last trade was placed, see _settled_trade_result()
+        self._prev_deal_id = None
+
+        # Candles pushed by the platform's quote WebSocket, see _drain_ws_frames()
+        self._candles = CandleBuffer()
+        self._rng = np.random.default_rng()
+
+        # Background market analysis at the end of the trade interval, see _next_market_signal().
+        # The async trading loop runs Selenium calls in worker threads but awaits each one,
+        # and a running prefetch is awaited before the driver is used again. _driver_lock
+        # additionally serializes the page-state and performance-log reads of get_market_data().
+        self._driver_lock = threading.Lock()
+        self._prefetch = None
+
+        # Warm restart from the state saved after the last settled trade
+        if restore_state:
+            self._load_state()
 
         # Initialize WebDriver
         self.setup_driver()
@@ -73,24 +215,100 @@ class PocketOptionBot:
         """Initialize the WebDriver for browser automation"""
         logger.info("Setting up WebDriver...")
         chrome_options = Options()
-        # Uncomment the line below to run in headless mode (no browser window)
-        # chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--start-maximized")
+        # Run without a browser window unless POCKET_OPTION_HEADLESS=0
+        if env("POCKET_OPTION_HEADLESS", "1") != "0":
+            chrome_options.add_argument("--headless=new")
+            chrome_options.add_argument("--window-size=1920,1080")
+        else:
+            chrome_options.add_argument("--start-maximized")
         chrome_options.add_argument("--disable-notifications")
 
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        # Keep cookies, local storage and the HTTP cache between runs
+        chrome_options.add_argument(f"--user-data-dir={CHROME_PROFILE_DIR}")
+        chrome_options.add_argument("--disk-cache-size=200000000")
+
+        # Skip rendering work the bot does not need
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_argument("--disable-background-networking")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+        # Return from driver.get() at DOMContentLoaded; the explicit waits cover the rest
+        chrome_options.page_load_strategy = 'eager'
+        # Capture DevTools Network events so quote WebSocket frames can be read back
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+        # Reuse a known chromedriver; webdriver-manager does a network check on every install()
+        for source, driver_path in self._known_driver_paths():
+            try:
+                self.driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+                break
+            except WebDriverException as e:
+                logger.warning("ChromeDriver from %s (%s) failed to start: %s", source, driver_path, e.msg)
+
+        if self.driver is None:
+            driver_path = ChromeDriverManager().install()
+            self.driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+            self._save_driver_path(driver_path)
+
+        self.driver.execute_cdp_cmd("Network.enable", {})
+
+    def _known_driver_paths(self):
+        """Chromedriver paths to try before installing: CHROMEDRIVER_PATH, then the last successful install"""
+        paths = []
+        path = env("CHROMEDRIVER_PATH")
+        if path:
+            if os.path.exists(path):
+                paths.append(("CHROMEDRIVER_PATH", path))
+            else:
+                logger.warning("CHROMEDRIVER_PATH %s does not exist, ignoring it", path)
+
+        try:
+            with open(DRIVER_CACHE_FILE) as f:
+                cached = json.load(f).get("path")
+        except (OSError, ValueError, AttributeError):
+            cached = None
+        if cached and cached != path and os.path.exists(cached):
+            paths.append(("the driver cache", cached))
+        return paths
+
+    def _save_driver_path(self, driver_path):
+        """Remember the chromedriver path of a successful install"""
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(DRIVER_CACHE_FILE, 'w') as f:
+                json.dump({"path": driver_path}, f)
+        except OSError as e:
+            logger.warning("Could not cache ChromeDriver path: %s", e)
 
     def login(self):
         """Login to Pocket Option platform"""
         logger.info("Logging in to Pocket Option...")
         try:
-            self.driver.get("https://pocketoption.com/en/login/")
-
-            # Wait for the login form to load
-            WebDriverWait(self.driver, 10).until(
+            # A session saved in the Chrome profile opens the platform directly;
+            # otherwise the platform redirects to the login form. A restored session
+            # can take as long as a fresh login to load, so wait as long for it.
+            self.driver.get(TRADING_URL)
+            page = fast_wait(self.driver, 30, poll_frequency=0.2).until(EC.any_of(
+                EC.presence_of_element_located((By.CLASS_NAME, "trading-platform")),
                 EC.presence_of_element_located((By.ID, "email"))
-            )
+            ))
+
+            if page.get_attribute("id") != "email":
+                logger.info("Restored saved session, login form skipped")
+                return True
+
+            if not self.driver.current_url.startswith(LOGIN_URL):
+                self.driver.get(LOGIN_URL)
+
+                # Wait for the login form to load
+                fast_wait(self.driver).until(
+                    EC.presence_of_element_located((By.ID, "email"))
+                )
 
             # Enter login credentials
             self.driver.find_element(By.ID, "email").send_keys(self.email)
@@ -100,43 +318,69 @@ class PocketOptionBot:
             self.driver.find_element(By.XPATH, "//button[@type='submit']").click()
 
             # Wait for the trading platform to load
-            WebDriverWait(self.driver, 30).until(
+            fast_wait(self.driver, 30, poll_frequency=0.2).until(
                 EC.presence_of_element_located((By.CLASS_NAME, "trading-platform"))
             )
 
             logger.info("Successfully logged in")
             return True
         except Exception as e:
-            logger.error(f"Login failed: {str(e)}")
+            logger.error("Login failed: %s", e)
             return False
 
+    def _read_page_state(self):
+        """Get balance, newest deal result and chart candles with one CDP call"""
+        with self._driver_lock:
+            response = self.driver.execute_cdp_cmd(
+                "Runtime.evaluate", {"expression": PAGE_STATE_JS, "returnByValue": True}
+            )
+        return response.get("result", {}).get("value") or {}
+
+    def _settled_trade_result(self):
+        """The settled result of the last trade, or False while it is pending
+
+        Only a deal row newer than the one seen before placing the trade counts;
+        if the rows carry no id, no result is accepted before the trade expires.
+        """
+        state = self._read_page_state()
+        if self._prev_deal_id is not None:
+            if state.get("deal_id") == self._prev_deal_id:
+                return False
+        elif self._n_trades:
+            last_trade = self._trades[self._n_trades - 1]
+            if time.time() < last_trade['ts'] + int(last_trade['expiry']) * 60:
+                return False
+
+        result = state.get("result")
+        return result if result in ("win", "loss") else False
+
     def get_balance(self):
         """Get current account balance"""
         try:
-            balance_element = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "balance-value"))
+            balance_text = fast_wait(self.driver).until(
+                lambda d: self._read_page_state().get("balance")
             )
-            balance_text = balance_element.text.strip().replace("$", "").replace(",", "")
+            balance_text = balance_text.strip().replace("$", "").replace(",", "")
             self.balance = float(balance_text)
-            logger.info(f"Current balance: ${self.balance}")
+            logger.info("Current balance: $%s", self.balance)
             return self.balance
         except Exception as e:
-            logger.error(f"Failed to get balance: {str(e)}")
+            logger.error("Failed to get balance: %s", e)
             return None
 
     def select_asset(self, asset_name="EUR/USD"):
         """Select a trading asset"""
         try:
-            logger.info(f"Selecting asset: {asset_name}")
+            logger.info("Selecting asset: %s", asset_name)
 
             # Click on asset selector
-            asset_selector = WebDriverWait(self.driver, 10).until(
+            asset_selector = fast_wait(self.driver).until(
                 EC.element_to_be_clickable((By.CLASS_NAME, "asset-selector"))
             )
             asset_selector.click()
 
             # Wait for asset list to appear
-            WebDriverWait(self.driver, 10).until(
+            fast_wait(self.driver).until(
                 EC.presence_of_element_located((By.CLASS_NAME, "asset-list"))
             )
 
@@ -147,63 +391,110 @@ class PocketOptionBot:
             asset_element.click()
 
             self.current_asset = asset_name
-            logger.info(f"Asset selected: {asset_name}")
+            # The trade panel is re-rendered and quotes restart for the new asset
+            self._controls.clear()
+            self._candles.clear()
+            logger.info("Asset selected: %s", asset_name)
             return True
         except Exception as e:
-            logger.error(f"Failed to select asset: {str(e)}")
+            logger.error("Failed to select asset: %s", e)
             return False
 
+    def _resolve_control(self, name):
+        """Look up a trade panel element and cache it"""
+        locator, condition = TRADE_CONTROLS[name]
+        element = fast_wait(self.driver).until(condition(locator))
+        self._controls[name] = element
+        return element
+
+    def _use_control(self, name, action):
+        """Run action on a cached trade panel element, re-resolving it if it went stale"""
+        element = self._controls.get(name) or self._resolve_control(name)
+        try:
+            action(element)
+        except StaleElementReferenceException:
+            action(self._resolve_control(name))
+
     def get_market_data(self, timeframe="1m", num_candles=20):
         """Get market data for analysis"""
         try:
-            logger.info(f"Getting market data for {self.current_asset}, timeframe: {timeframe}")
-
-            # This is a placeholder - in a real implementation, you would extract
-            # price data from the DOM or use WebSocket connections if possible
-
-            # For now, we'll simulate getting candle data
-            # In a real implementation, you would parse this from the chart
-            candles = []
-            for i in range(num_candles):
-                # Simulate candle data (open, high, low, close)
-                open_price = 1.1000 + random.uniform(-0.0050, 0.0050)
-                high_price = open_price + random.uniform(0.0001, 0.0020)
-                low_price = open_price - random.uniform(0.0001, 0.0020)
-                close_price = open_price + random.uniform(-0.0015, 0.0015)
-
-                candle = {
-                    'timestamp': datetime.now().timestamp() - (num_candles - i) * 60,
-                    'open': open_price,
-                    'high': high_price,
-                    'low': low_price,
-                    'close': close_price,
-                    'volume': random.uniform(10, 100)
-                }
-                candles.append(candle)
-
-            df = pd.DataFrame(candles)
-            logger.info(f"Retrieved {len(df)} candles")
-            return df
+            logger.info("Getting market data for %s, timeframe: %s", self.current_asset, timeframe)
+
+            # Prefer candles pushed over the quote WebSocket, then the chart's own data
+            self._drain_ws_frames()
+            if len(self._candles) >= num_candles:
+                data = MarketData.from_rows(self._candles.last(num_candles))
+            else:
+                candles = self._read_page_state().get("candles")
+                if candles:
+                    data = MarketData.from_rows(candles[-num_candles:])
+                else:
+                    # Fall back to simulated candles when no market data is available
+                    data = self._simulate_candles(num_candles)
+
+            logger.info("Retrieved %d candles", len(data))
+            return data
         except Exception as e:
-            logger.error(f"Failed to get market data: {str(e)}")
+            logger.error("Failed to get market data: %s", e)
             return None
 
+    def _drain_ws_frames(self):
+        """Move candle updates from captured WebSocket frames into the candle buffer
+
+        Frames look like {"asset": "EURUSD_otc", "candles": [[ts, o, h, l, c, v], ...]},
+        optionally wrapped as a Socket.IO event: 42["candles", {...}].
+        """
+        asset = self.current_asset.replace("/", "")
+        with self._driver_lock:
+            entries = self.driver.get_log("performance")
+        for entry in entries:
+            # Most entries are other Network events; skip them before paying for json.loads
+            if WS_FRAME_EVENT not in entry["message"]:
+                continue
+            message = json.loads(entry["message"])["message"]
+            if message.get("method") != WS_FRAME_EVENT:
+                continue
+
+            payload = message["params"]["response"]["payloadData"].lstrip("0123456789")
+            try:
+                frame = json.loads(payload)
+            except ValueError:
+                continue
+            if isinstance(frame, list) and len(frame) == 2:
+                frame = frame[1]
+
+            if isinstance(frame, dict) and frame.get("candles") and str(frame.get("asset", "")).split("_")[0] == asset:
+                self._candles.push(frame["candles"])
+
+    def _simulate_candles(self, num_candles):
+        """Generate random candle data for testing without a live chart"""
+        rng = self._rng
+        opens = 1.1000 + rng.uniform(-0.0050, 0.0050, num_candles)
+        return MarketData(
+            ts=datetime.now().timestamp() - np.arange(num_candles, 0, -1, dtype=np.float64) * 60,
+            open=opens,
+            high=opens + rng.uniform(0.0001, 0.0020, num_candles),
+            low=opens - rng.uniform(0.0001, 0.0020, num_candles),
+            close=opens + rng.uniform(-0.0015, 0.0015, num_candles),
+            volume=rng.uniform(10, 100, num_candles)
+        )
+
     def analyze_market(self, data):
         """Analyze market data and decide on trade direction"""
         try:
-            logger.info(f"Analyzing market data using {self.strategy_type} strategy...")
+            logger.info("Analyzing market data using %s strategy...", self.strategy_type)
 
             # Use the configured strategy to analyze the market
             direction = self.strategy.analyze(data)
 
             if direction:
-                logger.info(f"Analysis result: {direction.upper()} signal detected")
+                logger.info("Analysis result: %s signal detected", direction.upper())
             else:
                 logger.info("No clear trading signal detected")
 
             return direction
         except Exception as e:
-            logger.error(f"Market analysis failed: {str(e)}")
+            logger.error("Market analysis failed: %s", e)
             return None
 
     def place_trade(self, direction, amount, expiry_minutes=None):
@@ -214,27 +505,23 @@ class PocketOptionBot:
         try:
             # Check risk management limits
             if self.daily_trades >= self.max_daily_trades:
-                logger.warning(f"Maximum daily trades limit reached ({self.max_daily_trades}). Skipping trade.")
+                logger.warning("Maximum daily trades limit reached (%s). Skipping trade.", self.max_daily_trades)
                 return False
 
             if self.daily_loss >= self.max_daily_loss:
-                logger.warning(f"Maximum daily loss limit reached (${self.max_daily_loss}). Skipping trade.")
+                logger.warning("Maximum daily loss limit reached ($%s). Skipping trade.", self.max_daily_loss)
                 return False
 
-            logger.info(f"Placing {direction.upper()} trade for ${amount} with {expiry_minutes} minute(s) expiry")
+            logger.info("Placing %s trade for $%s with %s minute(s) expiry", direction.upper(), amount, expiry_minutes)
 
             # Set trade amount
-            amount_input = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "amount-input"))
-            )
-            amount_input.clear()
-            amount_input.send_keys(str(amount))
+            def set_amount(amount_input):
+                amount_input.clear()
+                amount_input.send_keys(str(amount))
+            self._use_control("amount_input", set_amount)
 
             # Set expiry time
-            expiry_selector = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CLASS_NAME, "expiry-selector"))
-            )
-            expiry_selector.click()
+            self._use_control("expiry_selector", lambda el: el.click())
 
             # Select the expiry time from dropdown
             expiry_option = self.driver.find_element(
@@ -242,85 +529,222 @@ class PocketOptionBot:
             )
             expiry_option.click()
 
+            # Remember the newest deal so its result is not taken for this trade's
+            self._prev_deal_id = self._read_page_state().get("deal_id")
+
             # Click on Call or Put button
             if direction.lower() == "call":
-                call_button = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.CLASS_NAME, "call-button"))
-                )
-                call_button.click()
+                self._use_control("call_button", lambda el: el.click())
             else:
-                put_button = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.CLASS_NAME, "put-button"))
-                )
-                put_button.click()
+                self._use_control("put_button", lambda el: el.click())
 
             # Record the trade
-            trade = {
-                'timestamp': datetime.now(),
-                'asset': self.current_asset,
-                'direction': direction,
-                'amount': amount,
-                'expiry_minutes': expiry_minutes,
-                'status': 'pending',
-                'martingale_level': len([t for t in self.trade_history if t['status'] == 'loss']) if self.martingale_enabled else 0
-            }
-            self.trade_history.append(trade)
+            self._record_trade(
+                direction, amount, expiry_minutes,
+                self._current_martingale_level if self.martingale_enabled else 0
+            )
             self.daily_trades += 1
 
-            logger.info(f"Trade placed: {direction.upper()} ${amount}")
+            logger.info("Trade placed: %s $%s", direction.upper(), amount)
             return True
         except Exception as e:
-            logger.error(f"Failed to place trade: {str(e)}")
+            logger.error("Failed to place trade: %s", e)
             return False
 
-    def check_trade_result(self, wait_time_seconds=70):
-        """Check the result of the last trade"""
+    def _record_trade(self, direction, amount, expiry_minutes, martingale_level):
+        """Append a pending trade, doubling the trade array when it is full"""
+        if self._n_trades == len(self._trades):
+            grown = np.empty(len(self._trades) * 2, dtype=TRADE_DTYPE)
+            grown[:self._n_trades] = self._trades
+            self._trades = grown
+
+        self._trades[self._n_trades] = (
+            datetime.now().timestamp(),
+            amount,
+            expiry_minutes,
+            TRADE_DIRECTIONS.index(direction.lower()),
+            TRADE_STATUSES.index("pending"),
+            martingale_level
+        )
+        self._n_trades += 1
+
+    @property
+    def trade_history(self):
+        """Trades as a list of dicts (built on demand from the trade array)"""
+        return [
+            {
+                'timestamp': datetime.fromtimestamp(trade['ts']),
+                'asset': self.current_asset,
+                'direction': TRADE_DIRECTIONS[trade['direction']],
+                'amount': float(trade['amount']),
+                'expiry_minutes': int(trade['expiry']),
+                'status': TRADE_STATUSES[trade['status']],
+                'martingale_level': int(trade['mg_level'])
+            }
+            for trade in self._trades[:self._n_trades]
+        ]
+
+    def _settlement_timeout(self):
+        """Seconds to wait for the last trade: its expiry plus SETTLEMENT_MARGIN_SECONDS"""
+        expiry_minutes = int(self._trades['expiry'][self._n_trades - 1]) if self._n_trades else self.expiry_minutes
+        return expiry_minutes * 60 + SETTLEMENT_MARGIN_SECONDS
+
+    async def check_trade_result(self, wait_time_seconds=None):
+        """Wait for the result of the last trade, polling the deals list without blocking the event loop"""
+        if wait_time_seconds is None:
+            wait_time_seconds = self._settlement_timeout()
+
+        async def settled():
+            while True:
+                try:
+                    result = await asyncio.to_thread(self._settled_trade_result)
+                except WebDriverException as e:
+                    # e.g. the page's execution context was destroyed by a re-render
+                    logger.warning("Ignoring error while polling trade result: %s", e)
+                    result = False
+                if result:
+                    return result
+                await asyncio.sleep(SETTLEMENT_POLL_SECONDS)
+
         try:
-            logger.info(f"Waiting {wait_time_seconds} seconds for trade to complete...")
-            time.sleep(wait_time_seconds)
+            logger.info("Waiting up to %s seconds for trade to complete...", wait_time_seconds)
+            result = await asyncio.wait_for(settled(), wait_time_seconds)
+            return self._settle_trade(result)
+        except asyncio.TimeoutError:
+            logger.error("Trade result not available after %s seconds", wait_time_seconds)
+            return None
+        except Exception as e:
+            logger.error("Failed to check trade result: %s", e)
+            return None
+
+    def _settle_trade(self, result):
+        """Record the settled result of the last trade and save the bot state"""
+        # Update the last trade record
+        if self._n_trades:
+            last_trade = self._trades[self._n_trades - 1]
+            last_trade['status'] = TRADE_STATUSES.index(result)
+
+            # Update session counters, daily loss and the Martingale level for the next trade
+            if result == "loss":
+                self._losses += 1
+                self.daily_loss += float(last_trade['amount'])
+                self._current_martingale_level = min(self._current_martingale_level + 1, self.max_martingale_level - 1)
+            else:
+                self._wins += 1
+                self._current_martingale_level = 0
 
-            # In a real implementation, you would check the trade result from the DOM
-            # For now, we'll simulate a random result
-            result = random.choice(["win", "loss"])
+        self._save_state()
 
-            # Update the last trade record
-            if self.trade_history:
-                last_trade = self.trade_history[-1]
-                last_trade['status'] = result
+        logger.info("Trade result: %s", result.upper())
+        return result
 
-                # Update daily loss if the trade was a loss
-                if result == "loss":
-                    self.daily_loss += last_trade['amount']
+    def _save_state(self):
+        """Write today's trades, counters and recent candles to STATE_FILE atomically"""
+        day = self._trading_day or date.today()
+        day_start = datetime.combine(day, datetime.min.time()).timestamp()
+        first_today = np.searchsorted(self._trades['ts'][:self._n_trades], day_start)
 
-            logger.info(f"Trade result: {result.upper()}")
-            return result
+        meta = np.array([(
+            day.isoformat(),
+            self.current_asset,
+            self._current_martingale_level,
+            self.daily_trades,
+            self.daily_loss
+        )], dtype=STATE_META_DTYPE)
+
+        tmp_file = STATE_FILE + ".tmp"
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(tmp_file, 'wb') as f:
+                np.savez(
+                    f,
+                    meta=meta,
+                    trades=self._trades[first_today:self._n_trades],
+                    candles=self._candles.last(len(self._candles))
+                )
+            os.replace(tmp_file, STATE_FILE)
+        except OSError as e:
+            logger.warning("Could not save bot state: %s", e)
+
+    def _load_state(self):
+        """Restore the state written by _save_state(), if any"""
+        try:
+            with np.load(STATE_FILE, allow_pickle=False) as state:
+                meta = state['meta'][0]
+                trades = state['trades']
+                candles = state['candles']
+        except FileNotFoundError:
+            return
         except Exception as e:
-            logger.error(f"Failed to check trade result: {str(e)}")
-            return None
+            logger.warning("Ignoring unreadable bot state %s: %s", STATE_FILE, e)
+            return
+
+        if trades.dtype != TRADE_DTYPE or meta.dtype != STATE_META_DTYPE:
+            logger.warning("Ignoring bot state %s written by an incompatible version", STATE_FILE)
+            return
+
+        self._current_martingale_level = min(int(meta['mg_level']), max(self.max_martingale_level - 1, 0))
+
+        # Today's trades and daily limits only carry over within the same day
+        if meta['day'] == date.today().isoformat():
+            self._trading_day = date.today()
+            self.daily_trades = int(meta['daily_trades'])
+            self.daily_loss = float(meta['daily_loss'])
 
-    def calculate_martingale_amount(self, last_result):
-        """Calculate the next trade amount using Martingale strategy"""
+            self._n_trades = len(trades)
+            self._trades = np.empty(max(self._n_trades * 2, self.max_daily_trades, 1), dtype=TRADE_DTYPE)
+            self._trades[:self._n_trades] = trades
+
+        if meta['asset'] == self.current_asset and len(candles) and \
+                time.time() - candles[-1, 0] <= CANDLE_RESTORE_MAX_AGE_SECONDS:
+            self._candles.push(candles)
+
+        logger.info("Restored %d trades from %s", self._n_trades, STATE_FILE)
+
+    def calculate_martingale_amount(self):
+        """Calculate the next trade amount using Martingale strategy
+
+        The level is advanced on losses and reset on wins by check_trade_result.
+        """
         if not self.martingale_enabled:
             return self.trade_amount
 
-        if not self.martingale_stack:
-            # Initialize the Martingale stack
-            self.martingale_stack = [self.trade_amount]
-            for i in range(1, self.max_martingale_level):
-                next_amount = self.martingale_stack[i-1] * self.martingale_coefficient
-                self.martingale_stack.append(round(next_amount, 2))
+        return self.martingale_stack[self._current_martingale_level]
 
-        if last_result == "win":
-            # Reset to the initial amount after a win
-            return self.martingale_stack[0]
-        else:
-            # Increase the amount after a loss
-            current_level = self.trade_history[-1].get('martingale_level', 0)
-            next_level = min(current_level + 1, self.max_martingale_level - 1)
-            return self.martingale_stack[next_level]
+    def _market_signal(self):
+        """Get market data and the trade direction for it"""
+        market_data = self.get_market_data()
+        direction = self.analyze_market(market_data) if market_data is not None else None
+        return market_data, direction
+
+    async def _next_market_signal(self):
+        """Return the prefetched (market data, direction) if still fresh, else compute it now
+
+        A running prefetch is always awaited, never abandoned: cancelling the task
+        would leave its thread using the driver and the strategy state.
+        """
+        prefetch, self._prefetch = self._prefetch, None
+        if prefetch is not None:
+            submitted, task = prefetch
+            try:
+                signal = await task
+            except Exception as e:
+                logger.warning("Prefetched market analysis unavailable: %s", e)
+            else:
+                if time.monotonic() - submitted <= PREFETCH_MAX_AGE_SECONDS:
+                    return signal
+        return await asyncio.to_thread(self._market_signal)
 
     def run_trading_session(self, duration_minutes=None, trade_interval_minutes=None):
         """Run an automated trading session"""
+        asyncio.run(self._run_session(duration_minutes, trade_interval_minutes))
+
+    async def _run_session(self, duration_minutes=None, trade_interval_minutes=None):
+        """Trading loop of run_trading_session()
+
+        Blocking Selenium calls run in worker threads, so waits and the
+        next market analysis are awaited instead of blocking the loop.
+        """
         # Use configuration values if not provided
         if duration_minutes is None:
             duration_minutes = self.config["trading"]["session_duration_minutes"]
@@ -328,112 +752,130 @@ class PocketOptionBot:
         if trade_interval_minutes is None:
             trade_interval_minutes = self.config["trading"]["trade_interval_minutes"]
 
-        logger.info(f"Starting trading session for {duration_minutes} minutes")
-        logger.info(f"Strategy: {self.strategy_type}")
-        logger.info(f"Asset: {self.current_asset}")
-        logger.info(f"Trade amount: ${self.trade_amount}")
-        logger.info(f"Martingale enabled: {self.martingale_enabled}")
+        logger.info("Starting trading session for %s minutes", duration_minutes)
+        logger.info("Strategy: %s", self.strategy_type)
+        logger.info("Asset: %s", self.current_asset)
+        logger.info("Trade amount: $%s", self.trade_amount)
+        logger.info("Martingale enabled: %s", self.martingale_enabled)
 
-        # Reset session counters
-        self.daily_trades = 0
-        self.daily_loss = 0
+        # Reset daily counters when a new trading day starts
+        today = date.today()
+        if self._trading_day != today:
+            self._trading_day = today
+            self.daily_trades = 0
+            self.daily_loss = 0
 
-        start_time = datetime.now()
-        end_time = start_time + pd.Timedelta(minutes=duration_minutes)
+        # Session statistics only cover trades placed from here on
+        self._session_first_trade = self._n_trades
+        self._wins = 0
+        self._losses = 0
+
+        # Monotonic clock: unaffected by wall-clock adjustments and cheaper than datetime.now()
+        end_ts = time.monotonic() + duration_minutes * 60
 
         # Login to the platform
-        if not self.login():
+        if not await asyncio.to_thread(self.login):
             logger.error("Failed to login. Aborting trading session.")
             return
 
         # Get initial balance
-        initial_balance = self.get_balance()
+        initial_balance = await asyncio.to_thread(self.get_balance)
 
         # Select asset
-        if not self.select_asset(self.current_asset):
+        if not await asyncio.to_thread(self.select_asset, self.current_asset):
             logger.error("Failed to select asset. Aborting trading session.")
             return
 
         # Main trading loop
-        while datetime.now() < end_time:
+        while time.monotonic() < end_ts:
             try:
+                # A trade whose result was missed would leave daily_loss and the Martingale
+                # level behind, so look for it again before trading on
+                if self._n_trades and self._trades['status'][self._n_trades - 1] == TRADE_STATUSES.index("pending"):
+                    if await self.check_trade_result(SETTLEMENT_MARGIN_SECONDS) is None:
+                        logger.warning("Result of the last trade is still unknown. Skipping this trade.")
+                        await asyncio.sleep(60)
+                        continue
+
                 # Check if we've reached daily limits
                 if self.daily_trades >= self.max_daily_trades:
-                    logger.warning(f"Maximum daily trades limit reached ({self.max_daily_trades}). Stopping session.")
+                    logger.warning("Maximum daily trades limit reached (%s). Stopping session.", self.max_daily_trades)
                     break
 
                 if self.daily_loss >= self.max_daily_loss:
-                    logger.warning(f"Maximum daily loss limit reached (${self.max_daily_loss}). Stopping session.")
+                    logger.warning("Maximum daily loss limit reached ($%s). Stopping session.", self.max_daily_loss)
                     break
 
-                # Get market data
-                market_data = self.get_market_data()
+                # Get market data and trade direction
+                market_data, direction = await self._next_market_signal()
                 if market_data is None:
                     logger.warning("Failed to get market data. Skipping this trade.")
-                    time.sleep(60)  # Wait a minute before trying again
+                    await asyncio.sleep(60)  # Wait a minute before trying again
                     continue
 
-                # Analyze market and get trade direction
-                direction = self.analyze_market(market_data)
                 if direction is None:
                     logger.warning("No clear trading signal. Skipping this trade.")
-                    time.sleep(60)
+                    await asyncio.sleep(60)
                     continue
 
                 # Determine trade amount (using Martingale if enabled)
-                if self.trade_history and self.martingale_enabled:
-                    last_result = self.trade_history[-1]['status']
-                    amount = self.calculate_martingale_amount(last_result)
-                else:
-                    amount = self.trade_amount
+                amount = self.calculate_martingale_amount()
 
                 # Place the trade
-                if not self.place_trade(direction, amount):
+                if not await asyncio.to_thread(self.place_trade, direction, amount):
                     logger.warning("Failed to place trade. Skipping this cycle.")
-                    time.sleep(60)
+                    await asyncio.sleep(60)
                     continue
 
+                # Save the pending trade and daily count in case the bot dies while it settles
+                self._save_state()
+
                 # Check trade result and update statistics
-                trade_result = self.check_trade_result()
+                trade_result = await self.check_trade_result(self._settlement_timeout())
 
                 # Log current session statistics
-                wins = sum(1 for trade in self.trade_history if trade['status'] == 'win')
-                losses = sum(1 for trade in self.trade_history if trade['status'] == 'loss')
-                win_rate = (wins / len(self.trade_history)) * 100 if self.trade_history else 0
-
-                logger.info(f"Session stats - Trades: {len(self.trade_history)}, Wins: {wins}, Losses: {losses}, Win rate: {win_rate:.2f}%")
-                logger.info(f"Daily loss: ${self.daily_loss}")
-
-                # Wait until the next trade interval
-                next_trade_time = datetime.now() + pd.Timedelta(minutes=trade_interval_minutes)
-                wait_seconds = (next_trade_time - datetime.now()).total_seconds()
+                if logger.isEnabledFor(logging.INFO):
+                    session_trades = self._n_trades - self._session_first_trade
+                    win_rate = (self._wins / session_trades) * 100 if session_trades else 0
+                    logger.info("Session stats - Trades: %s, Wins: %s, Losses: %s, Win rate: %.2f%%", session_trades, self._wins, self._losses, win_rate)
+                    logger.info("Daily loss: $%s", self.daily_loss)
+
+                # Wait until the next trade interval, analyzing the next candles
+                # during the last PREFETCH_LEAD_SECONDS of the wait
+                wait_seconds = trade_interval_minutes * 60
                 if wait_seconds > 0:
-                    logger.info(f"Waiting {wait_seconds:.0f} seconds until next trade")
-                    time.sleep(wait_seconds)
+                    logger.info("Waiting %.0f seconds until next trade", wait_seconds)
+                    lead_seconds = min(PREFETCH_LEAD_SECONDS, wait_seconds)
+                    await asyncio.sleep(wait_seconds - lead_seconds)
+                    self._prefetch = (time.monotonic(), asyncio.create_task(asyncio.to_thread(self._market_signal)))
+                    await asyncio.sleep(lead_seconds)
 
             except Exception as e:
-                logger.error(f"Error during trading cycle: {str(e)}")
-                time.sleep(60)  # Wait a minute before continuing
+                logger.error("Error during trading cycle: %s", e)
+                await asyncio.sleep(60)  # Wait a minute before continuing
+
+        # Let an analysis that is still running finish before the driver is used again
+        if self._prefetch is not None:
+            await asyncio.gather(self._prefetch[1], return_exceptions=True)
+            self._prefetch = None
 
         # Get final balance
-        final_balance = self.get_balance()
+        final_balance = await asyncio.to_thread(self.get_balance)
         profit = final_balance - initial_balance if final_balance and initial_balance else None
 
         # Log session summary
         logger.info("Trading session completed")
-        logger.info(f"Initial balance: ${initial_balance}")
-        logger.info(f"Final balance: ${final_balance}")
-        logger.info(f"Profit/Loss: ${profit}")
+        logger.info("Initial balance: $%s", initial_balance)
+        logger.info("Final balance: $%s", final_balance)
+        logger.info("Profit/Loss: $%s", profit)
 
         # Generate trade statistics
-        wins = sum(1 for trade in self.trade_history if trade['status'] == 'win')
-        losses = sum(1 for trade in self.trade_history if trade['status'] == 'loss')
-        total_trades = len(self.trade_history)
-        win_rate = (wins / total_trades) * 100 if total_trades > 0 else 0
+        total_trades = self._n_trades - self._session_first_trade
+        win_rate = (self._wins / total_trades) * 100 if total_trades > 0 else 0
 
-        logger.info(f"Total trades: {total_trades}")
-        logger.info(f"Wins: {wins}, Losses: {losses}")
-        logger.info(f"Win rate: {win_rate:.2f}%")
+        logger.info("Total trades: %s", total_trades)
+        logger.info("Wins: %s, Losses: %s", self._wins, self._losses)
+        logger.info("Win rate: %.2f%%", win_rate)
 
     def close(self):
         """Close the WebDriver and clean up"""
@@ -460,7 +902,7 @@ if __name__ == "__main__":
         bot.run_trading_session()
 
     except Exception as e:
-        logger.error(f"Unhandled exception: {str(e)}")
+        logger.error("Unhandled exception: %s", e)
     finally:
         # Make sure to close the WebDriver
         if 'bot' in locals() and bot.driver:
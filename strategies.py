@@ -1,52 +1,167 @@
-import pandas as pd
 import numpy as np
 import random
 import logging
+from collections import deque
+from dataclasses import dataclass
+from numba import njit
 
 logger = logging.getLogger("PocketOptionBot.Strategies")
 
+# Strategy name -> strategy class, filled in by @register at import time
+STRATEGY_REGISTRY = {}
+
+
+def register(name):
+    """Class decorator that makes a strategy available to get_strategy() under name"""
+    def decorator(cls):
+        STRATEGY_REGISTRY[name] = cls
+        return cls
+    return decorator
+
+@dataclass
+class MarketData:
+    """Candle data stored as parallel float64 arrays, oldest candle first"""
+    ts: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    
+    def __len__(self):
+        return len(self.close)
+    
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from rows of [ts, open, high, low, close, volume]"""
+        columns = np.asarray(rows, dtype=np.float64).reshape(-1, 6).T
+        return cls(*(np.ascontiguousarray(col) for col in columns))
+    
+    def to_frame(self):
+        """Return the candles as a pandas DataFrame (for logging and debugging)"""
+        import pandas as pd
+        return pd.DataFrame({
+            'timestamp': self.ts,
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': self.volume
+        })
+
+
+@njit(cache=True, fastmath=True)
+def sma_last(close, n):
+    """Return the simple moving average of the last n values of close"""
+    return close[-n:].mean()
+
+
+# No fastmath here: the NaN result for a flat series must survive compilation
+@njit(cache=True)
+def wilder_rsi_last(close, period):
+    """Return the last RSI value of close using Wilder's smoothing
+
+    The averages are seeded with the simple mean of the first `period`
+    price changes and then smoothed as avg = (avg * (period - 1) + x) / period.
+    Returns NaN when the price did not move at all.
+    """
+    delta = np.diff(close)
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    
+    avg_gain = gains[:period].mean()
+    avg_loss = losses[:period].mean()
+    for i in range(period, len(delta)):
+        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+    
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else np.nan
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
 class TradingStrategy:
     """Base class for trading strategies"""
     def __init__(self, parameters=None):
         self.parameters = parameters or {}
     
     def analyze(self, data):
-        """Analyze market data and return trading signal"""
+        """Analyze market data (a MarketData instance) and return trading signal"""
         raise NotImplementedError("Subclasses must implement analyze method")
 
 
+@register("trend_following")
 class TrendFollowingStrategy(TradingStrategy):
-    """Simple trend following strategy using moving average crossover"""
+    """Simple trend following strategy using moving average crossover
+
+    The moving averages are kept as running sums over the last short/long
+    closes and updated only with candles newer than the previous call.
+    """
     def __init__(self, parameters=None):
         super().__init__(parameters)
         self.short_period = self.parameters.get("short_period", 5)
         self.long_period = self.parameters.get("long_period", 10)
+        
+        self._short = deque(maxlen=self.short_period)
+        self._long = deque(maxlen=self.long_period)
+        self._short_sum = 0.0
+        self._long_sum = 0.0
+        self._last_ts = None
+    
+    def _warm_up(self, data):
+        """Rebuild both windows from the tail of data"""
+        self._short = deque(data.close[-self.short_period:].tolist(), maxlen=self.short_period)
+        self._long = deque(data.close[-self.long_period:].tolist(), maxlen=self.long_period)
+        self._short_sum = sma_last(data.close, self.short_period) * self.short_period
+        self._long_sum = sma_last(data.close, self.long_period) * self.long_period
+    
+    def _push(self, price):
+        """Add the close of a new candle to both windows"""
+        for window, attr in ((self._short, "_short_sum"), (self._long, "_long_sum")):
+            total = getattr(self, attr)
+            if len(window) == window.maxlen:
+                total -= window[0]
+            window.append(price)
+            setattr(self, attr, total + price)
+    
+    def _replace_last(self, price):
+        """Update the close of the newest (still forming) candle"""
+        self._short_sum += price - self._short[-1]
+        self._long_sum += price - self._long[-1]
+        self._short[-1] = price
+        self._long[-1] = price
+    
+    def _update(self, data):
+        """Bring the windows up to date with data, incrementally when possible"""
+        i = np.searchsorted(data.ts, self._last_ts) if self._last_ts is not None else len(data)
+        if i < len(data) and data.ts[i] == self._last_ts:
+            # Continuous with what we have seen: only apply the candles after it
+            self._replace_last(float(data.close[i]))
+            for price in data.close[i + 1:].tolist():
+                self._push(price)
+        else:
+            # First call, or a gap since the last call
+            self._warm_up(data)
+        self._last_ts = data.ts[-1]
     
     def analyze(self, data):
         """Analyze using moving average crossover"""
         if len(data) < self.long_period:
-            logger.warning(f"Not enough data for analysis. Need at least {self.long_period} candles.")
+            logger.warning("Not enough data for analysis. Need at least %s candles.", self.long_period)
             return None
         
-        # Calculate moving averages
-        data['sma_short'] = data['close'].rolling(window=self.short_period).mean()
-        data['sma_long'] = data['close'].rolling(window=self.long_period).mean()
-        
-        # Get the last complete row of data
-        last_row = data.iloc[-1]
-        
-        # Check for NaN values
-        if pd.isna(last_row['sma_short']) or pd.isna(last_row['sma_long']):
-            logger.warning("Moving averages contain NaN values. Not enough data.")
-            return None
+        self._update(data)
+        sma_short = self._short_sum / self.short_period
+        sma_long = self._long_sum / self.long_period
         
         # Determine trade direction based on moving average crossover
-        if last_row['sma_short'] > last_row['sma_long']:
+        if sma_short > sma_long:
             return "call"  # Bullish signal
         else:
             return "put"  # Bearish signal
 
 
+@register("rsi")
 class RSIStrategy(TradingStrategy):
     """Strategy based on Relative Strength Index (RSI)"""
     def __init__(self, parameters=None):
@@ -56,45 +171,33 @@ class RSIStrategy(TradingStrategy):
         self.oversold = self.parameters.get("rsi_oversold", 30)
     
     def calculate_rsi(self, data):
-        """Calculate RSI indicator"""
-        delta = data['close'].diff()
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
-        
-        avg_gain = gain.rolling(window=self.rsi_period).mean()
-        avg_loss = loss.rolling(window=self.rsi_period).mean()
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
+        """Calculate the latest RSI value"""
+        return wilder_rsi_last(data.close, self.rsi_period)
     
     def analyze(self, data):
         """Analyze using RSI indicator"""
         if len(data) < self.rsi_period + 1:
-            logger.warning(f"Not enough data for RSI analysis. Need at least {self.rsi_period + 1} candles.")
+            logger.warning("Not enough data for RSI analysis. Need at least %s candles.", self.rsi_period + 1)
             return None
         
         # Calculate RSI
-        data['rsi'] = self.calculate_rsi(data)
-        
-        # Get the last complete row of data
-        last_row = data.iloc[-1]
+        rsi = self.calculate_rsi(data)
         
         # Check for NaN values
-        if pd.isna(last_row['rsi']):
-            logger.warning("RSI contains NaN values. Not enough data.")
+        if np.isnan(rsi):
+            logger.warning("RSI is undefined for a flat price series.")
             return None
         
         # Determine trade direction based on RSI
-        if last_row['rsi'] <= self.oversold:
+        if rsi <= self.oversold:
             return "call"  # Oversold condition, expect price to rise
-        elif last_row['rsi'] >= self.overbought:
+        elif rsi >= self.overbought:
             return "put"  # Overbought condition, expect price to fall
         else:
             return None  # No clear signal
 
 
+@register("random")
 class RandomStrategy(TradingStrategy):
     """Random strategy for testing purposes"""
     def __init__(self, parameters=None):
@@ -110,16 +213,18 @@ class RandomStrategy(TradingStrategy):
             return "put"
 
 
+def warm_up_kernels():
+    """Compile the numba kernels now so the first trade cycle does not pay for it"""
+    sample = np.linspace(1.0, 2.0, 32)
+    sma_last(sample, 5)
+    wilder_rsi_last(sample, 14)
+
+
 def get_strategy(strategy_type, parameters=None):
     """Factory function to create strategy instances"""
-    strategies = {
-        "trend_following": TrendFollowingStrategy,
-        "rsi": RSIStrategy,
-        "random": RandomStrategy
-    }
-    
-    if strategy_type not in strategies:
-        logger.warning(f"Unknown strategy type: {strategy_type}. Using trend_following instead.")
-        strategy_type = "trend_following"
+    strategy_class = STRATEGY_REGISTRY.get(strategy_type)
+    if strategy_class is None:
+        logger.warning("Unknown strategy type: %s. Using trend_following instead.", strategy_type)
+        strategy_class = TrendFollowingStrategy
     
-    return strategies[strategy_type](parameters)
+    return strategy_class(parameters)